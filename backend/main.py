@@ -1,26 +1,59 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+from pydantic import BaseModel, Field, field_validator
 import logging
 import os
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator, Literal
 from dotenv import load_dotenv
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 import json
+import orjson
+import re
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging: libraries at WARNING, application logs at INFO
+logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class HealthCheckFilter(logging.Filter):
+    """Drop uvicorn access log records for health probes."""
+    def filter(self, record: logging.LogRecord) -> bool:
+        # uvicorn.access args: (client_addr, method, path, http_version, status_code)
+        args = record.args
+        return not (isinstance(args, tuple) and len(args) > 2 and str(args[2]).startswith("/health"))
+
+logging.getLogger("uvicorn.access").addFilter(HealthCheckFilter())
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the AI service once per worker process, at startup."""
+    app.state.ai = SimpleAI()
+    yield
+
+# Interactive API docs are on by default; set ENABLE_API_DOCS=false in production
+API_DOCS_ENABLED = os.getenv("ENABLE_API_DOCS", "true").lower() == "true"
 
 # Create FastAPI app
 app = FastAPI(
     title="EduAI - Ultra Simple",
     description="AI Chat for Education - No Auth Required",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    docs_url="/docs" if API_DOCS_ENABLED else None,
+    redoc_url="/redoc" if API_DOCS_ENABLED else None,
+    openapi_url="/openapi.json" if API_DOCS_ENABLED else None
 )
 
 # Add CORS middleware with more permissive settings
@@ -40,7 +73,163 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# Only recent Starlette releases skip text/event-stream on their own; older ones
+# would compress and buffer the SSE stream, so it bypasses gzip explicitly
+UNCOMPRESSED_PATHS = {"/chat/stream"}
+
+class StreamSafeGZipMiddleware(GZipMiddleware):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"] in UNCOMPRESSED_PATHS:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+# Compress larger JSON bodies (exam lists, AI answers); SSE streams are left uncompressed
+app.add_middleware(StreamSafeGZipMiddleware, minimum_size=1024, compresslevel=5)
+
+# Static prompt text goes first so every call shares the same prefix, which
+# lets Gemini's prompt caching reuse it; per-request data is appended last.
+CHAT_PREAMBLE = "You are an educational AI assistant. Please respond helpfully to:"
+
+WRITTEN_GRADING_INSTRUCTIONS = """Grade the written answer below on a scale of 0 to the maximum points given.
+
+Please provide:
+1. A score from 0 to the maximum points
+2. Brief feedback explaining the score
+3. What was good about the answer
+4. What could be improved
+
+Format your response as JSON:
+{
+  "score": [number from 0 to the maximum points],
+  "feedback": "Brief feedback here",
+  "strengths": "What was good",
+  "improvements": "What could be improved"
+}"""
+
+BATCH_GRADING_INSTRUCTIONS = """Grade each written answer below on a scale of 0 to the maximum points given for that question.
+
+For every answer, please provide:
+1. A score from 0 to the maximum points
+2. Brief feedback explaining the score
+3. What was good about the answer
+4. What could be improved
+
+Format your response as JSON with one entry per answer, using the question IDs given:
+{
+  "grades": [
+    {
+      "question_id": "q1",
+      "score": [number from 0 to the maximum points],
+      "feedback": "Brief feedback here",
+      "strengths": "What was good",
+      "improvements": "What could be improved"
+    }
+  ]
+}"""
+
+MCQ_EXAM_INSTRUCTIONS = """Generate multiple choice questions using the exam details given below.
+
+For each question, provide:
+1. The question text
+2. 4 answer options (A, B, C, D)
+3. The correct answer
+4. A brief explanation
+
+Format the response as JSON with this structure:
+{
+  "questions": [
+    {
+      "id": "q1",
+      "question": "Question text here?",
+      "options": [
+        {"id": "A", "text": "Option A text", "is_correct": false},
+        {"id": "B", "text": "Option B text", "is_correct": true},
+        {"id": "C", "text": "Option C text", "is_correct": false},
+        {"id": "D", "text": "Option D text", "is_correct": false}
+      ],
+      "correct_answer": "B",
+      "explanation": "Explanation here"
+    }
+  ]
+}"""
+
+WRITTEN_EXAM_INSTRUCTIONS = """Generate written/essay questions using the exam details given below.
+
+For each question, provide:
+1. The question text
+2. Maximum points (distribute 100 points total across all questions)
+3. A sample answer or key points
+
+Format the response as JSON with this structure:
+{
+  "questions": [
+    {
+      "id": "q1",
+      "question": "Question text here?",
+      "max_points": 20,
+      "sample_answer": "Sample answer or key points here"
+    }
+  ]
+}"""
+
+EXAM_INSTRUCTIONS = {
+    "mcq": MCQ_EXAM_INSTRUCTIONS,
+    "written": WRITTEN_EXAM_INSTRUCTIONS
+}
+
+# Grading should be repeatable: the same answer must get the same score
+GRADING_GENERATION_CONFIG = {"temperature": 0}
+
+# Runs of spaces/tabs after the start of a line; leading indentation is left alone
+INNER_SPACES_PATTERN = re.compile(r"(?<=\S)[ \t]+")
+
+# Exact-match cache for AI responses, evicting the least recently used entry
+class ResponseCache:
+    def __init__(self, maxsize: int = 2048, ttl: float = 1800):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (expires_at, response)
+    
+    @staticmethod
+    def make_key(
+        prompt: str,
+        generation_config: Optional[dict] = None,
+        ignore_whitespace: bool = False
+    ) -> bytes:
+        """Hash the prompt together with its generation settings."""
+        if ignore_whitespace:
+            # "What is  DNA?" and "What is DNA? " should share one entry; case, line
+            # breaks and indentation are kept because they can change meaning
+            # ("Co" vs "CO", or an indented vs mis-indented code snippet)
+            prompt = "\n".join(
+                INNER_SPACES_PATTERN.sub(" ", line.rstrip())
+                for line in prompt.strip().splitlines()
+            )
+        settings = repr(sorted(generation_config.items())) if generation_config else ""
+        return hashlib.blake2b(f"{settings}\n{prompt}".encode(), digest_size=16).digest()
+    
+    def get(self, key: bytes) -> Optional[str]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at < time.monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return response
+    
+    def set(self, key: bytes, response: str):
+        self.entries[key] = (time.monotonic() + self.ttl, response)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
 # Simple AI service using Gemini
+class StreamError(Exception):
+    """A streamed AI response failed part-way; the message is safe to show to users."""
+
 class SimpleAI:
     def __init__(self):
         self.api_key = os.getenv("GEMINI_API_KEY")
@@ -51,27 +240,161 @@ class SimpleAI:
                 self.model = genai.GenerativeModel('gemini-2.0-flash')
                 logger.info("✅ Gemini AI initialized successfully")
             except Exception as e:
-                logger.error(f"❌ Failed to initialize Gemini AI: {e}")
+                logger.error("❌ Failed to initialize Gemini AI: %s", e)
                 self.model = None
         else:
             logger.warning("⚠️ GEMINI_API_KEY not found. AI will return demo responses.")
             self.model = None
+        self.cache = ResponseCache()
+        # cache key -> task for a Gemini call that identical prompts can wait on
+        self.inflight: Dict[bytes, asyncio.Task] = {}
+        # Cap in-flight Gemini calls so bursts queue here instead of piling up 429s
+        self.semaphore = asyncio.Semaphore(int(os.getenv("GEMINI_MAX_CONCURRENCY", "8")))
+        self.timeout = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "30"))
     
-    def get_response(self, message: str) -> str:
-        """Get AI response to user message."""
+    async def get_response(
+        self,
+        message: str,
+        generation_config: Optional[dict] = None,
+        use_cache: bool = True,
+        ignore_whitespace: bool = False
+    ) -> str:
+        """Get AI response to user message, reusing cached answers to identical prompts."""
         try:
             if self.model:
-                response = self.model.generate_content(f"You are an educational AI assistant. Please respond helpfully to: {message}")
-                return response.text
+                if not use_cache:
+                    return await self._generate(message, generation_config)
+                
+                cache_key = ResponseCache.make_key(message, generation_config, ignore_whitespace)
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    return cached
+                
+                # Identical prompts that arrive while one is being answered share its Gemini call
+                task = self.inflight.get(cache_key)
+                if task is None:
+                    task = asyncio.ensure_future(self._generate(message, generation_config, cache_key))
+                    self.inflight[cache_key] = task
+                    
+                    def finished(done: asyncio.Task) -> None:
+                        self.inflight.pop(cache_key, None)
+                        # Retrieve any error here too, in case every waiter has already gone away
+                        if not done.cancelled():
+                            done.exception()
+                    
+                    task.add_done_callback(finished)
+                # Shielded so one client disconnecting doesn't cancel the call for the others
+                return await asyncio.shield(task)
             else:
-                # Demo response when no API key
-                return f"🤖 Demo AI Response: I understand you asked about '{message}'. This is a demo response since no Gemini API key is configured. Please add GEMINI_API_KEY to your .env file for real AI responses."
+                return self.demo_response(message)
+        except asyncio.TimeoutError:
+            logger.error("AI Error: no response within %s seconds", self.timeout)
+            return "Sorry, the AI service took too long to respond. Please try again."
         except Exception as e:
-            logger.error(f"AI Error: {e}")
+            logger.error("AI Error: %s", e)
             return f"Sorry, I encountered an error while processing your request: {str(e)}"
-
-# Initialize AI service
-ai_service = SimpleAI()
+    
+    async def _generate(self, message: str, generation_config: Optional[dict] = None, cache_key: Optional[bytes] = None) -> str:
+        """Call Gemini once, caching the answer under cache_key if one is given."""
+        async with self.semaphore:
+            response = await asyncio.wait_for(
+                self.model.generate_content_async(
+                    f"{CHAT_PREAMBLE} {message}",
+                    generation_config=generation_config
+                ),
+                timeout=self.timeout
+            )
+        if cache_key is not None:
+            self.cache.set(cache_key, response.text)
+        return response.text
+    
+    async def stream_response(self, message: str, use_cache: bool = True) -> AsyncIterator[str]:
+        """Stream AI response to user message as text chunks arrive.
+        
+        Shares cache entries with get_response for /chat: a cached answer is sent as one
+        chunk, and a stream that completes cleanly is cached.
+        """
+        if not self.model:
+            yield self.demo_response(message)
+            return
+        
+        if use_cache:
+            cache_key = ResponseCache.make_key(message, ignore_whitespace=True)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+        
+        # Gemini is read by a separate task so a slow client never holds a semaphore slot;
+        # the slot is released as soon as Gemini finishes, stalls or fails
+        chunks: asyncio.Queue = asyncio.Queue()
+        reader = asyncio.ensure_future(self._read_stream(message, chunks))
+        parts = []
+        try:
+            while (text := await chunks.get()) is not None:
+                if isinstance(text, StreamError):
+                    raise text
+                parts.append(text)
+                yield text
+        finally:
+            reader.cancel()
+        if use_cache:
+            self.cache.set(cache_key, "".join(parts))
+    
+    async def _read_stream(self, message: str, chunks: asyncio.Queue) -> None:
+        """Put Gemini's streamed text on chunks, giving up if any chunk takes longer than the timeout.
+        
+        Failures are put on chunks as a StreamError, followed by the None that ends every stream.
+        """
+        try:
+            async with self.semaphore:
+                response = await asyncio.wait_for(
+                    self.model.generate_content_async(
+                        f"{CHAT_PREAMBLE} {message}",
+                        stream=True
+                    ),
+                    timeout=self.timeout
+                )
+                stream = response.__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(stream.__anext__(), timeout=self.timeout)
+                    except StopAsyncIteration:
+                        break
+                    chunks.put_nowait(chunk.text)
+        except asyncio.TimeoutError:
+            logger.error("AI Streaming Error: no response within %s seconds", self.timeout)
+            chunks.put_nowait(StreamError("Sorry, the AI service took too long to respond. Please try again."))
+        except Exception as e:
+            # Details such as quota or key errors stay in the log, not in the chat
+            logger.error("AI Streaming Error: %s", e)
+            chunks.put_nowait(StreamError("Sorry, I encountered an error while processing your request. Please try again."))
+        finally:
+            chunks.put_nowait(None)
+    
+    def demo_response(self, message: str) -> str:
+        """Demo response when no API key is configured."""
+        return f"🤖 Demo AI Response: I understand you asked about '{message}'. This is a demo response since no Gemini API key is configured. Please add GEMINI_API_KEY to your .env file for real AI responses."
+
+def get_ai_service(request: Request) -> SimpleAI:
+    """Dependency returning the AI service created in lifespan."""
+    return request.app.state.ai
+
+# Matches from the first "{" to the last "}" of an AI response
+JSON_OBJECT_PATTERN = re.compile(r"\{.*\}", re.DOTALL)
+JSON_DECODER = json.JSONDecoder()
+
+def extract_json(ai_response: str) -> dict:
+    """Extract the JSON object from an AI response (in case there's extra text)."""
+    match = JSON_OBJECT_PATTERN.search(ai_response)
+    if not match:
+        raise ValueError("No JSON found in AI response")
+    try:
+        return orjson.loads(match.group(0))
+    except orjson.JSONDecodeError:
+        # A stray "}" after the object (e.g. in trailing prose) breaks the greedy match;
+        # decode just the first object and ignore whatever follows it
+        return JSON_DECODER.raw_decode(ai_response, match.start())[0]
 
 # Simple in-memory storage for demo (replace with real database)
 class ExamStorage:
@@ -82,7 +405,7 @@ class ExamStorage:
     def create_exam(self, exam_data: dict) -> str:
         exam_id = str(uuid.uuid4())
         exam_data['exam_id'] = exam_id
-        exam_data['created_at'] = datetime.now().isoformat()
+        exam_data['created_at'] = datetime.now(timezone.utc).isoformat()
         exam_data['status'] = 'in_progress'
         self.exams[exam_id] = exam_data
         
@@ -99,7 +422,7 @@ class ExamStorage:
     def update_exam(self, exam_id: str, updates: dict) -> bool:
         if exam_id in self.exams:
             self.exams[exam_id].update(updates)
-            self.exams[exam_id]['updated_at'] = datetime.now().isoformat()
+            self.exams[exam_id]['updated_at'] = datetime.now(timezone.utc).isoformat()
             return True
         return False
     
@@ -112,7 +435,18 @@ exam_storage = ExamStorage()
 
 # Request/Response models
 class ChatRequest(BaseModel):
-    message: str
+    message: str = Field(min_length=1)
+    # Exam-generation and grading prompts opt out so each call gets a fresh answer
+    cache: bool = True
+
+    @field_validator("message")
+    @classmethod
+    def message_not_blank(cls, v: str) -> str:
+        """Reject whitespace-only messages with a 422 before the handler runs."""
+        v = v.strip()
+        if not v:
+            raise ValueError("Message cannot be empty")
+        return v
 
 class ChatResponse(BaseModel):
     response: str
@@ -124,9 +458,9 @@ class ExamGenerateRequest(BaseModel):
     chat_id: Optional[str] = None
     title: str
     subject: str
-    exam_type: str  # "mcq" or "written"
+    exam_type: Literal["mcq", "written"]
     num_questions: int = 10
-    difficulty: str = "medium"  # "easy", "medium", "hard"
+    difficulty: Literal["easy", "medium", "hard"] = "medium"
     topic: Optional[str] = None
 
 class MCQOption(BaseModel):
@@ -176,7 +510,7 @@ class ExamListResponse(BaseModel):
 
 # Routes
 @app.get("/health")
-async def health_check():
+async def health_check(ai_service: SimpleAI = Depends(get_ai_service)):
     """Health check endpoint."""
     return {
         "status": "healthy",
@@ -184,19 +518,21 @@ async def health_check():
         "ai_available": ai_service.model is not None
     }
 
+@app.get("/healthz")
+async def liveness_check():
+    """Liveness probe - only reports that the process is up."""
+    return {"ok": True}
+
 @app.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+async def chat(request: ChatRequest, ai_service: SimpleAI = Depends(get_ai_service)):
     """Simple chat endpoint - no auth required."""
     try:
-        if not request.message.strip():
-            raise HTTPException(status_code=400, detail="Message cannot be empty")
-        
-        logger.info(f"💬 Processing message: {request.message[:50]}...")
+        logger.info("💬 Processing message: %s...", request.message[:50])
         
         # Get AI response
-        ai_response = ai_service.get_response(request.message)
+        ai_response = await ai_service.get_response(request.message, use_cache=request.cache, ignore_whitespace=True)
         
-        logger.info(f"✅ AI response generated successfully")
+        logger.info("✅ AI response generated successfully")
         
         return ChatResponse(
             response=ai_response,
@@ -204,86 +540,59 @@ async def chat(request: ChatRequest):
         )
         
     except Exception as e:
-        logger.error(f"❌ Chat error: {e}")
+        logger.error("❌ Chat error: %s", e)
         raise HTTPException(status_code=500, detail=f"Chat processing failed: {str(e)}")
 
+def sse_event(data: str, event: Optional[str] = None) -> str:
+    """Format a Server-Sent Events message, one data line per text line."""
+    lines = [f"event: {event}"] if event else []
+    lines.extend(f"data: {line}" for line in data.split("\n"))
+    return "\n".join(lines) + "\n\n"
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest, ai_service: SimpleAI = Depends(get_ai_service)):
+    """Stream the chat response as Server-Sent Events - no auth required."""
+    logger.info("💬 Streaming message: %s...", request.message[:50])
+    
+    async def event_stream():
+        try:
+            async for text in ai_service.stream_response(request.message, use_cache=request.cache):
+                yield sse_event(text)
+        except StreamError as e:
+            # Sent as its own event so clients drop the partial answer instead of appending to it
+            yield sse_event(str(e), event="error")
+            return
+        yield sse_event("", event="done")
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.post("/exams/generate", response_model=ExamGenerateResponse)
-async def generate_exam(request: ExamGenerateRequest):
+async def generate_exam(request: ExamGenerateRequest, ai_service: SimpleAI = Depends(get_ai_service)):
     """Generate an MCQ or written exam using AI."""
     try:
-        logger.info(f"📝 Generating {request.exam_type} exam: {request.title}")
-        
-        if request.exam_type not in ["mcq", "written"]:
-            raise HTTPException(status_code=400, detail="exam_type must be 'mcq' or 'written'")
+        logger.info("📝 Generating %s exam: %s", request.exam_type, request.title)
         
         # Create AI prompt for exam generation
-        if request.exam_type == "mcq":
-            prompt = f"""Generate {request.num_questions} multiple choice questions for {request.subject}.
-Title: {request.title}
-Difficulty: {request.difficulty}
-{f'Topic: {request.topic}' if request.topic else ''}
-
-For each question, provide:
-1. The question text
-2. 4 answer options (A, B, C, D)
-3. The correct answer
-4. A brief explanation
+        prompt = f"""{EXAM_INSTRUCTIONS[request.exam_type]}
 
-Format the response as JSON with this structure:
-{{
-  "questions": [
-    {{
-      "id": "q1",
-      "question": "Question text here?",
-      "options": [
-        {{"id": "A", "text": "Option A text", "is_correct": false}},
-        {{"id": "B", "text": "Option B text", "is_correct": true}},
-        {{"id": "C", "text": "Option C text", "is_correct": false}},
-        {{"id": "D", "text": "Option D text", "is_correct": false}}
-      ],
-      "correct_answer": "B",
-      "explanation": "Explanation here"
-    }}
-  ]
-}}"""
-        else:  # written exam
-            prompt = f"""Generate {request.num_questions} written/essay questions for {request.subject}.
+Number of questions: {request.num_questions}
+Subject: {request.subject}
 Title: {request.title}
 Difficulty: {request.difficulty}
-{f'Topic: {request.topic}' if request.topic else ''}
-
-For each question, provide:
-1. The question text
-2. Maximum points (distribute 100 points total across all questions)
-3. A sample answer or key points
-
-Format the response as JSON with this structure:
-{{
-  "questions": [
-    {{
-      "id": "q1",
-      "question": "Question text here?",
-      "max_points": 20,
-      "sample_answer": "Sample answer or key points here"
-    }}
-  ]
-}}"""
+{f'Topic: {request.topic}' if request.topic else ''}"""
         
-        # Get AI response
-        ai_response = ai_service.get_response(prompt)
+        # Get AI response (not cached, so regenerating an exam gives fresh questions)
+        ai_response = await ai_service.get_response(prompt, use_cache=False)
         
         # Try to parse JSON from AI response
         try:
-            # Extract JSON from AI response (in case there's extra text)
-            start_idx = ai_response.find('{')
-            end_idx = ai_response.rfind('}') + 1
-            if start_idx != -1 and end_idx != -1:
-                json_str = ai_response[start_idx:end_idx]
-                exam_data = json.loads(json_str)
-            else:
-                raise ValueError("No JSON found in AI response")
+            exam_data = extract_json(ai_response)
         except (json.JSONDecodeError, ValueError) as e:
-            logger.error(f"Failed to parse AI response as JSON: {e}")
+            logger.error("Failed to parse AI response as JSON: %s", e)
             # Fallback: create a simple exam structure
             if request.exam_type == "mcq":
                 exam_data = {
@@ -340,7 +649,7 @@ Format the response as JSON with this structure:
         
         exam_id = exam_storage.create_exam(exam_record)
         
-        logger.info(f"✅ Exam generated successfully: {exam_id}")
+        logger.info("✅ Exam generated successfully: %s", exam_id)
         
         return ExamGenerateResponse(
             exam_id=exam_id,
@@ -354,14 +663,16 @@ Format the response as JSON with this structure:
         )
         
     except Exception as e:
-        logger.error(f"❌ Exam generation error: {e}")
+        logger.error("❌ Exam generation error: %s", e)
         raise HTTPException(status_code=500, detail=f"Exam generation failed: {str(e)}")
 
-@app.get("/exams/user/{user_id}", response_model=ExamListResponse)
+# Built from our own storage, so skip response validation and serialize with orjson;
+# ExamListResponse still documents the shape in the OpenAPI schema
+@app.get("/exams/user/{user_id}", responses={200: {"model": ExamListResponse}})
 async def get_user_exams(user_id: str):
     """Get all exams for a specific user."""
     try:
-        logger.info(f"📋 Getting exams for user: {user_id}")
+        logger.info("📋 Getting exams for user: %s", user_id)
         
         exams = exam_storage.get_user_exams(user_id)
         
@@ -387,30 +698,43 @@ async def get_user_exams(user_id: str):
             
             exam_list.append(exam_summary)
         
-        logger.info(f"✅ Found {len(exam_list)} exams for user")
+        logger.info("✅ Found %s exams for user", len(exam_list))
         
-        return ExamListResponse(
-            exams=exam_list,
-            success=True
+        return Response(
+            content=orjson.dumps({"exams": exam_list, "success": True}),
+            media_type="application/json"
         )
         
     except Exception as e:
-        logger.error(f"❌ Error getting user exams: {e}")
+        logger.error("❌ Error getting user exams: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to get user exams: {str(e)}")
 
+def exam_etag(exam: dict) -> str:
+    """Weak ETag for an exam; it changes whenever the exam is updated."""
+    version = f"{exam['exam_id']}:{exam.get('updated_at', exam['created_at'])}"
+    return f'W/"{hashlib.blake2b(version.encode(), digest_size=8).hexdigest()}"'
+
 @app.get("/exams/{exam_id}")
-async def get_exam(exam_id: str):
+async def get_exam(exam_id: str, request: Request):
     """Get specific exam details."""
     try:
-        logger.info(f"📄 Getting exam: {exam_id}")
+        logger.info("📄 Getting exam: %s", exam_id)
         
         exam = exam_storage.get_exam(exam_id)
         if not exam:
             raise HTTPException(status_code=404, detail="Exam not found")
         
-        logger.info(f"✅ Exam retrieved successfully")
+        # Let clients revalidate a copy they already have without resending the exam
+        etag = exam_etag(exam)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if_none_match = request.headers.get("if-none-match", "")
+        if if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(",")):
+            return Response(status_code=304, headers=headers)
         
-        return {
+        logger.info("✅ Exam retrieved successfully")
+        
+        # Serialize straight to bytes rather than through FastAPI's jsonable_encoder
+        return Response(content=orjson.dumps({
             "exam_id": exam["exam_id"],
             "title": exam["title"],
             "subject": exam["subject"],
@@ -422,19 +746,19 @@ async def get_exam(exam_id: str):
             "created_at": exam["created_at"],
             "updated_at": exam.get("updated_at", exam["created_at"]),
             "success": True
-        }
+        }), media_type="application/json", headers=headers)
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"❌ Error getting exam: {e}")
+        logger.error("❌ Error getting exam: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to get exam: {str(e)}")
 
 @app.post("/exams/submit", response_model=ExamSubmitResponse)
-async def submit_exam(request: ExamSubmitRequest):
+async def submit_exam(request: ExamSubmitRequest, ai_service: SimpleAI = Depends(get_ai_service)):
     """Submit exam answers and get graded results."""
     try:
-        logger.info(f"📝 Submitting exam: {request.exam_id}")
+        logger.info("📝 Submitting exam: %s", request.exam_id)
         
         exam = exam_storage.get_exam(request.exam_id)
         if not exam:
@@ -450,7 +774,7 @@ async def submit_exam(request: ExamSubmitRequest):
         if exam["exam_type"] == "mcq":
             results = await grade_mcq_exam(exam, request.answers)
         else:  # written exam
-            results = await grade_written_exam(exam, request.answers)
+            results = await grade_written_exam(exam, request.answers, ai_service)
         
         # Update exam with results
         exam_updates = {
@@ -464,7 +788,7 @@ async def submit_exam(request: ExamSubmitRequest):
         
         exam_storage.update_exam(request.exam_id, exam_updates)
         
-        logger.info(f"✅ Exam submitted and graded successfully")
+        logger.info("✅ Exam submitted and graded successfully")
         
         return ExamSubmitResponse(
             exam_id=request.exam_id,
@@ -478,7 +802,7 @@ async def submit_exam(request: ExamSubmitRequest):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"❌ Error submitting exam: {e}")
+        logger.error("❌ Error submitting exam: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to submit exam: {str(e)}")
 
 async def grade_mcq_exam(exam: dict, answers: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -519,96 +843,118 @@ async def grade_mcq_exam(exam: dict, answers: List[Dict[str, Any]]) -> Dict[str,
         "exam_type": "mcq"
     }
 
-async def grade_written_exam(exam: dict, answers: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Grade a written exam using AI assistance."""
-    questions = exam["exam_data"]["questions"]
-    total_score = 0
-    max_score = sum(q.get("max_points", 10) for q in questions)
-    question_results = []
+async def grade_written_batch(questions: List[dict], answer_map: Dict[str, str], ai_service: SimpleAI) -> Dict[str, dict]:
+    """Grade several written answers with one AI call, returning grading data by question id."""
+    answer_blocks = "\n\n---\n\n".join(
+        f"""Question ID: {question["id"]}
+Maximum points: {question.get("max_points", 10)}
+Question: {question["question"]}
+Student Answer: {answer_map[question["id"]]}
+Sample Answer/Key Points: {question.get("sample_answer", "")}"""
+        for question in questions
+    )
+    grading_prompt = f"{BATCH_GRADING_INSTRUCTIONS}\n\n{answer_blocks}"
     
-    # Create answer lookup
-    answer_map = {ans["question_id"]: ans["answer"] for ans in answers}
+    try:
+        ai_response = await ai_service.get_response(grading_prompt, GRADING_GENERATION_CONFIG, ignore_whitespace=True)
+        grades = extract_json(ai_response).get("grades", [])
+        # Entries without a numeric score are dropped so those answers get their own call
+        return {
+            grade["question_id"]: grade
+            for grade in grades
+            if isinstance(grade, dict)
+            and "question_id" in grade
+            and isinstance(grade.get("score"), (int, float))
+            and not isinstance(grade["score"], bool)
+        }
+    except (json.JSONDecodeError, ValueError, AttributeError, TypeError) as e:
+        logger.error("Failed to parse batched AI grading response: %s", e)
+        return {}
+
+async def grade_written_answer(question: dict, user_answer: str, ai_service: SimpleAI, grading_data: Optional[dict] = None) -> Dict[str, Any]:
+    """Grade a single written answer using AI assistance.
     
-    for question in questions:
-        question_id = question["id"]
-        user_answer = answer_map.get(question_id, "")
-        question_text = question["question"]
-        max_points = question.get("max_points", 10)
-        sample_answer = question.get("sample_answer", "")
-        
-        if not user_answer.strip():
-            # No answer provided
-            question_score = 0
-            feedback = "No answer provided."
-        else:
-            # Use AI to grade the written answer
-            grading_prompt = f"""Grade this written answer on a scale of 0 to {max_points}.
+    If grading_data from a batched grading call is given, it is used instead of asking the AI again.
+    """
+    question_text = question["question"]
+    max_points = question.get("max_points", 10)
+    sample_answer = question.get("sample_answer", "")
+    strengths = ""
+    improvements = ""
+    
+    if not user_answer.strip():
+        # No answer provided
+        question_score = 0
+        feedback = "No answer provided."
+    else:
+        # Use AI to grade the written answer
+        grading_prompt = f"""{WRITTEN_GRADING_INSTRUCTIONS}
+
+Maximum points: {max_points}
 
 Question: {question_text}
 
 Student Answer: {user_answer}
 
-Sample Answer/Key Points: {sample_answer}
-
-Please provide:
-1. A score from 0 to {max_points}
-2. Brief feedback explaining the score
-3. What was good about the answer
-4. What could be improved
-
-Format your response as JSON:
-{{
-  "score": [number from 0 to {max_points}],
-  "feedback": "Brief feedback here",
-  "strengths": "What was good",
-  "improvements": "What could be improved"
-}}"""
-            
-            try:
-                ai_response = ai_service.get_response(grading_prompt)
+Sample Answer/Key Points: {sample_answer}"""
+        
+        try:
+            if grading_data is None:
+                # An answer resubmitted with different spacing gets the cached grade
+                ai_response = await ai_service.get_response(grading_prompt, GRADING_GENERATION_CONFIG, ignore_whitespace=True)
                 
                 # Try to parse JSON from AI response
-                start_idx = ai_response.find('{')
-                end_idx = ai_response.rfind('}') + 1
-                if start_idx != -1 and end_idx != -1:
-                    json_str = ai_response[start_idx:end_idx]
-                    grading_data = json.loads(json_str)
-                    question_score = min(max(grading_data.get("score", 0), 0), max_points)
-                    feedback = grading_data.get("feedback", "AI grading completed")
-                    strengths = grading_data.get("strengths", "")
-                    improvements = grading_data.get("improvements", "")
-                else:
-                    raise ValueError("No JSON found in AI response")
-                    
-            except (json.JSONDecodeError, ValueError) as e:
-                logger.error(f"Failed to parse AI grading response: {e}")
-                # Fallback grading (simple length-based scoring)
-                answer_length = len(user_answer.strip())
-                if answer_length >= 100:
-                    question_score = max_points * 0.8
-                elif answer_length >= 50:
-                    question_score = max_points * 0.6
-                elif answer_length >= 20:
-                    question_score = max_points * 0.4
-                else:
-                    question_score = max_points * 0.2
+                grading_data = extract_json(ai_response)
+            question_score = min(max(grading_data.get("score", 0), 0), max_points)
+            feedback = grading_data.get("feedback", "AI grading completed")
+            strengths = grading_data.get("strengths", "")
+            improvements = grading_data.get("improvements", "")
                 
-                feedback = "Answer received and graded based on length and effort."
-                strengths = "Answer provided"
-                improvements = "Consider providing more detailed responses"
-        
-        total_score += question_score
-        
-        question_results.append({
-            "question_id": question_id,
-            "question": question_text,
-            "user_answer": user_answer,
-            "score": question_score,
-            "max_points": max_points,
-            "feedback": feedback,
-            "strengths": strengths if 'strengths' in locals() else "",
-            "improvements": improvements if 'improvements' in locals() else ""
-        })
+        except (json.JSONDecodeError, ValueError, TypeError) as e:
+            logger.error("Failed to parse AI grading response: %s", e)
+            # Fallback grading (simple length-based scoring)
+            answer_length = len(user_answer.strip())
+            if answer_length >= 100:
+                question_score = max_points * 0.8
+            elif answer_length >= 50:
+                question_score = max_points * 0.6
+            elif answer_length >= 20:
+                question_score = max_points * 0.4
+            else:
+                question_score = max_points * 0.2
+            
+            feedback = "Answer received and graded based on length and effort."
+            strengths = "Answer provided"
+            improvements = "Consider providing more detailed responses"
+    
+    return {
+        "question_id": question["id"],
+        "question": question_text,
+        "user_answer": user_answer,
+        "score": question_score,
+        "max_points": max_points,
+        "feedback": feedback,
+        "strengths": strengths,
+        "improvements": improvements
+    }
+
+async def grade_written_exam(exam: dict, answers: List[Dict[str, Any]], ai_service: SimpleAI) -> Dict[str, Any]:
+    """Grade a written exam using AI assistance."""
+    questions = exam["exam_data"]["questions"]
+    max_score = sum(q.get("max_points", 10) for q in questions)
+    
+    # Create answer lookup
+    answer_map = {ans["question_id"]: ans["answer"] for ans in answers}
+    
+    # Grade all answered questions in one Gemini call; anything the batch
+    # doesn't cover falls back to its own call, and those run concurrently
+    answered = [q for q in questions if answer_map.get(q["id"], "").strip()]
+    batch_grades = await grade_written_batch(answered, answer_map, ai_service) if len(answered) > 1 else {}
+    question_results = await asyncio.gather(*(
+        grade_written_answer(question, answer_map.get(question["id"], ""), ai_service, batch_grades.get(question["id"]))
+        for question in questions
+    ))
+    total_score = sum(result["score"] for result in question_results)
     
     percentage = (total_score / max_score) * 100 if max_score > 0 else 0
     
@@ -13,7 +13,8 @@ def main():
     """Start the ultra-simple server."""
     print("🚀 Starting EduAI Ultra-Simple Backend...")
     print("📍 Server will run at: http://localhost:8000")
-    print("🔗 API docs at: http://localhost:8000/docs")
+    if os.getenv("ENABLE_API_DOCS", "true").lower() == "true":
+        print("🔗 API docs at: http://localhost:8000/docs")
     print("💬 Chat endpoint: http://localhost:8000/chat")
     print()
     
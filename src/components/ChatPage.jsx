@@ -554,35 +554,26 @@ function ChatPage({ onNavigate }) {
     setInput('');
     setIsLoading(true);
     
+    const aiMessageId = Date.now() + 1;
+    const showAiMessage = (text) => {
+      setMessages(prev => prev.some(msg => msg.id === aiMessageId)
+        ? prev.map(msg => msg.id === aiMessageId ? { ...msg, text } : msg)
+        : [...prev, { id: aiMessageId, from: "ai", text, timestamp: new Date().toISOString() }]
+      );
+    };
+    
     try {
-      // Get AI response
-      const aiResponse = await apiService.sendMessage(currentInput);
+      // Stream the AI response into the chat as it is generated
+      const aiResponse = await apiService.streamMessage(currentInput, showAiMessage);
       
       // Clean the AI response to remove formatting
-      const cleanedResponse = cleanResponse(aiResponse);
-      
-      // Add AI response
-      const aiMessage = {
-        id: Date.now() + 1,
-        from: "ai",
-        text: cleanedResponse,
-        timestamp: new Date().toISOString()
-      };
-      
-      setMessages(prev => [...prev, aiMessage]);
+      showAiMessage(cleanResponse(aiResponse));
       
     } catch (error) {
       console.error('Failed to get AI response:', error);
       
-      // Add error message
-      const errorMessage = {
-        id: Date.now() + 1,
-        from: "ai",
-        text: "Sorry, I'm having trouble connecting to the AI service. Please try again later.",
-        timestamp: new Date().toISOString()
-      };
-      
-      setMessages(prev => [...prev, errorMessage]);
+      // Show error message in place of any partial response
+      showAiMessage("Sorry, I'm having trouble connecting to the AI service. Please try again later.");
     } finally {
       setIsLoading(false);
     }
@@ -6,7 +6,7 @@ class ApiService {
     this.baseURL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
   }
 
-  async sendMessage(message, context = null) {
+  async sendMessage(message, context = null, cache = true) {
     try {
       const response = await fetch(`${this.baseURL}/chat`, {
         method: 'POST',
@@ -14,7 +14,8 @@ class ApiService {
           'Content-Type': 'application/json'
         },
         body: JSON.stringify({
-          message
+          message,
+          cache
         })
       });
 
@@ -30,6 +31,63 @@ class ApiService {
     }
   }
 
+  async streamMessage(message, onChunk) {
+    try {
+      const response = await fetch(`${this.baseURL}/chat/stream`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({
+          message
+        })
+      });
+
+      if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let fullText = '';
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // Server-Sent Events are separated by a blank line
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+          const lines = buffer.slice(0, boundary).split('\n');
+          buffer = buffer.slice(boundary + 2);
+
+          const data = lines
+            .filter(line => line.startsWith('data: '))
+            .map(line => line.slice(6))
+            .join('\n');
+
+          if (lines.includes('event: done')) {
+            return fullText;
+          }
+          if (lines.includes('event: error')) {
+            throw new Error(data);
+          }
+
+          fullText += data;
+          onChunk(fullText);
+        }
+      }
+
+      // The connection closed before the server said the response was complete
+      throw new Error('Response stream ended unexpectedly');
+    } catch (error) {
+      console.error('API Error:', error);
+      throw new Error(`Failed to get AI response: ${error.message}`);
+    }
+  }
+
   async healthCheck() {
     try {
       const response = await fetch(`${this.baseURL}/health`);
@@ -49,7 +107,7 @@ class ApiService {
       const aiPrompt = this.createExamPrompt(examData);
       console.log('AI Prompt:', aiPrompt);
       
-      const aiResponse = await this.sendMessage(aiPrompt);
+      const aiResponse = await this.sendMessage(aiPrompt, null, false);
       console.log('AI Response received:', aiResponse);
       
       // Parse AI response to extract questions
@@ -452,7 +510,7 @@ Please provide a score from 0 to ${maxPoints} and brief feedback. Consider:
 Respond with just a number between 0 and ${maxPoints}.`;
 
       try {
-        const gradeResponse = await this.sendMessage(gradingPrompt);
+        const gradeResponse = await this.sendMessage(gradingPrompt, null, false);
         
         // Extract numeric score from AI response
         const scoreMatch = gradeResponse.match(/(\d+(?:\.\d+)?)/);